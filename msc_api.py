@@ -0,0 +1,138 @@
+# msc_api.py
+# ===========================================
+# MSC Tracking over HTTP (the JSON endpoint the tracking page calls itself)
+# ===========================================
+
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# ---------------- CONFIG ----------------
+TRACKING_PAGE = "https://www.msc.com/en/track-a-shipment"
+TRACKING_API = "https://www.msc.com/api/feature/tools/TrackingInfo"
+TRACKING_MODE_CONTAINER = "0"
+MAX_WORKERS = 16
+TIMEOUT = 15
+USER_AGENT = (
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
+    "AppleWebKit/537.36 (KHTML, like Gecko) Chrome/121.0.0.0 Safari/537.36"
+)
+# ----------------------------------------
+
+logger = logging.getLogger(__name__)
+
+
+def create_session():
+    """Keep-alive session with a connection pool big enough for the worker threads."""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=32, pool_maxsize=32)
+    session.mount("https://", adapter)
+    session.headers.update({
+        "User-Agent": USER_AGENT,
+        "Accept": "application/json, text/plain, */*",
+        "Content-Type": "application/json",
+        "X-Requested-With": "XMLHttpRequest",
+        "Origin": "https://www.msc.com",
+        "Referer": TRACKING_PAGE,
+    })
+    # load the page once so the session carries the same cookies the XHR would
+    try:
+        session.get(TRACKING_PAGE, timeout=TIMEOUT)
+    except requests.RequestException:
+        logger.warning("Could not warm session on %s", TRACKING_PAGE)
+    return session
+
+
+def _latest_event(events, key):
+    """First event (newest first, as MSC returns them) that carries `key`."""
+    for ev in events or []:
+        if ev.get(key):
+            return ev
+    return None
+
+
+def parse_tracking_info(payload, container_number):
+    """
+    Map the TrackingInfo JSON onto the same dict the Selenium extractor returns,
+    plus "Latest Event" (description of the newest event) for msc_cache.status_of.
+    """
+    data = {"ETA": None, "Port of Discharge": None, "Vessel/Voyage": None, "Equipment Handling Facility": None}
+    latest = None
+
+    wanted = container_number.strip().upper()
+    bills = (payload.get("Data") or {}).get("BillOfLadings") or []
+    for bill in bills:
+        containers = bill.get("ContainersInfo") or []
+        info = next((c for c in containers if (c.get("ContainerNumber") or "").strip().upper() == wanted), None)
+        # a bill with a single unnamed container can only be the one we asked for
+        if info is None and len(containers) == 1 and not containers[0].get("ContainerNumber"):
+            info = containers[0]
+        if info is None:
+            continue
+
+        general = bill.get("GeneralTrackingInfo") or {}
+        data["ETA"] = info.get("PodEtaDate") or general.get("FinalPodEtaDate") or None
+        data["Port of Discharge"] = general.get("PortOfDischarge") or None
+
+        events = info.get("Events") or []
+        if events:
+            latest = (events[0].get("Description") or "").strip() or None
+        vessel_ev = _latest_event(events, "Detail")
+        if vessel_ev:
+            parts = [d.strip() for d in vessel_ev["Detail"] if d and d.strip() and d.strip().upper() != "N.A"]
+            data["Vessel/Voyage"] = " / ".join(parts) or None
+
+        facility_ev = _latest_event(events, "EquipmentHandling")
+        if facility_ev:
+            name = (facility_ev["EquipmentHandling"].get("Name") or "").strip()
+            if name and name.upper() != "N.A":
+                data["Equipment Handling Facility"] = name
+        break
+
+    if latest:
+        data["Latest Event"] = latest
+    return data
+
+
+def fetch(session, container_number):
+    """
+    One POST per container. Raises on HTTP errors, when MSC reports no result
+    or when the result carries none of the fields.
+    """
+    resp = session.post(
+        TRACKING_API,
+        json={"trackingNumber": container_number, "trackingMode": TRACKING_MODE_CONTAINER},
+        timeout=TIMEOUT,
+    )
+    resp.raise_for_status()
+    payload = resp.json()
+    if not payload.get("IsSuccess"):
+        raise ValueError(f"MSC returned no tracking info for {container_number}")
+    data = parse_tracking_info(payload, container_number)
+    # IsSuccess with nothing we can use: let the browser fallback have a go
+    if not any(data.values()):
+        raise ValueError(f"MSC tracking info for {container_number} has none of the fields")
+    return data
+
+
+def fetch_all(container_list, max_workers=MAX_WORKERS):
+    """
+    Fetch all containers concurrently. Returns {container: data or None};
+    None marks a container the caller should retry another way.
+    """
+    session = create_session()
+
+    def safe_fetch(container):
+        try:
+            return fetch(session, container)
+        except Exception as e:
+            logger.warning("API lookup failed for %s: %s", container, e)
+            return None
+
+    try:
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            return dict(zip(container_list, pool.map(safe_fetch, container_list)))
+    finally:
+        session.close()
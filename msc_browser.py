@@ -0,0 +1,697 @@
+# msc_browser.py
+# ===========================================
+# MSC Tracking in Chrome (shared by main.py and app.py)
+# ===========================================
+
+import time
+import random
+import logging
+import os
+import queue
+import threading
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+from selenium import webdriver
+from selenium.webdriver.chrome.service import Service
+from selenium.webdriver.chrome.options import Options
+from selenium.webdriver.common.by import By
+from selenium.webdriver.common.keys import Keys
+from selenium.common.exceptions import StaleElementReferenceException, TimeoutException, WebDriverException
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
+from webdriver_manager.chrome import ChromeDriverManager
+
+# ---------------- CONFIG ----------------
+TRACKING_PAGE = "https://www.msc.com/en/track-a-shipment"
+HEADLESS = True       # set False to watch the browser
+MAX_WAIT = 10         # shorter explicit wait
+COOKIE_WAIT = 2       # per-selector wait once a cookie banner is known to be there
+COOKIE_SDK_WAIT = 3   # how long OneTrust gets to inject its banner before we assume there is none
+BROWSER_WORKERS = 8   # parallel Chrome instances for the browser fallback
+IN_PAGE_BATCH = 25    # containers per in-page JS loop (0 = drive each one from Python)
+# persistent Chrome profiles, one per worker slot (keep the cookie consent and HTTP cache between runs)
+PROFILE_DIR = os.path.expanduser("~/.msc_tracker_profile")
+DRIVER_PATH_CACHE = os.path.expanduser("~/.cache/msc_tracker/driver_path.txt")
+HUMANIZE = os.environ.get("MSC_HUMANIZE") == "1"  # jitter between containers
+# Selenium Grid (see docker-compose.yml); when set, browsers run on the grid nodes
+GRID_URL = os.environ.get("GRID_URL")
+GRID_WORKERS = int(os.environ.get("GRID_WORKERS", "15"))  # one session per grid node
+INPUT_LOCATOR = (By.CSS_SELECTOR, "input#trackingNumber")
+# result locators, built once; the JS extractor gets the CSS strings as arguments
+RESULTS_CELL = (By.CSS_SELECTOR, ".msc-flow-tracking__cell")
+VESSEL_CELL = (By.CSS_SELECTOR, ".msc-flow-tracking__cell--five")
+FACILITY_CELL = (By.CSS_SELECTOR, ".msc-flow-tracking__cell--six")
+VESSEL_VALUE = (By.CSS_SELECTOR, ".msc-flow-tracking__cell--five .data-value")
+FACILITY_VALUE = (By.CSS_SELECTOR, ".msc-flow-tracking__cell--six .data-value")
+HEADING_FIELDS = [("ETA", "POD ETA"), ("Port of Discharge", "Port of Discharge")]  # value follows the heading
+SELECTOR_FIELDS = [("Vessel/Voyage", VESSEL_VALUE), ("Equipment Handling Facility", FACILITY_VALUE)]
+COOKIE_BUTTONS = [
+    (By.ID, "onetrust-accept-btn-handler"),
+    (By.CSS_SELECTOR, "button#onetrust-accept-btn-handler"),
+    (By.XPATH, "//button[contains(text(),'Accept') or contains(text(),'Accept All') or contains(text(),'I Agree')]"),
+]
+COOKIE_OVERLAY = (By.CSS_SELECTOR, ".onetrust-pc-dark-filter")
+COOKIE_BANNER = (By.CSS_SELECTOR, "#onetrust-banner-sdk")
+# true once the OneTrust SDK is loaded and reports the banner as already answered
+ONETRUST_ANSWERED_JS = (
+    "return !!(window.OneTrust && OneTrust.IsAlertBoxClosed && OneTrust.IsAlertBoxClosed());"
+)
+USER_AGENT = (
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
+    "AppleWebKit/537.36 (KHTML, like Gecko) Chrome/121.0.0.0 Safari/537.36"
+)
+# requests dropped by CDP before they leave the browser (none of them feed the tracking data)
+BLOCKED_URLS = [
+    "*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.svg", "*.woff*", "*.ttf", "*.mp4", "*.css",
+    "*google-analytics*", "*googletagmanager*", "*doubleclick*", "*hotjar*",
+]
+# counts DOM mutations inside the results area so waits can poll one integer
+RESULTS_OBSERVER_JS = """
+window.__mscDirty = 0;
+new MutationObserver(function (mutations) {
+    for (const m of mutations) {
+        const el = m.target.nodeType === 1 ? m.target : m.target.parentElement;
+        const inResults = el && el.closest('.msc-flow-tracking');
+        const addsResults = Array.from(m.addedNodes).some(
+            n => n.nodeType === 1 && (n.matches('.msc-flow-tracking') || n.querySelector('.msc-flow-tracking'))
+        );
+        if (inResults || addsResults) {
+            window.__mscDirty++;
+            return;
+        }
+    }
+}).observe(document, {subtree: true, childList: true, characterData: true});
+"""
+# reads all four fields inside the page in a single round-trip, using CSS class hooks only
+EXTRACT_JS = """
+const byHeading = arguments[0], bySelector = arguments[1];
+const clean = (el) => {
+    const t = el ? (el.innerText || '').trim() : '';
+    return (t && t.toUpperCase() !== 'N.A') ? t : null;
+};
+const firstValue = (sel) => {
+    for (const el of document.querySelectorAll(sel)) {
+        const t = clean(el);
+        if (t) return t;
+    }
+    return null;
+};
+const headings = Array.from(document.querySelectorAll('.data-heading'));
+const afterHeading = (label) => {
+    const h = headings.find(el => el.textContent.includes(label));
+    return h ? clean(h.nextElementSibling) : null;
+};
+const cellWithHeading = (labels) => {
+    const h = headings.find(el => labels.some(l => el.textContent.includes(l)));
+    const cell = h && h.closest('.msc-flow-tracking__cell');
+    return cell ? clean(cell.querySelector('.data-value')) : null;
+};
+const out = {};
+for (const [field, label] of byHeading) out[field] = afterHeading(label);
+for (const [field, sel] of bySelector) out[field] = firstValue(sel);
+out["Vessel/Voyage"] = out["Vessel/Voyage"] || cellWithHeading(['Vessel', 'Voyage']);
+return out;
+"""
+# short text of the results area; the element is cached on window until it is detached
+SNAPSHOT_JS = """
+let el = window.__mscResults;
+if (!el || !el.isConnected) {
+    el = window.__mscResults = document.querySelector('.msc-flow-tracking__data, .msc-flow-tracking__cell');
+}
+return el ? el.textContent.trim().slice(0, 200) : '';
+"""
+# true once the results area names the container passed in (guards against the previous container's data)
+RESULTS_FOR_JS = """
+const el = document.querySelector('.msc-flow-tracking');
+return !!el && el.textContent.toUpperCase().includes(arguments[0].toUpperCase());
+"""
+# submits and scrapes a whole batch inside the page; settles on the observer counter.
+# Stops at the first container whose results do not show up and returns the rows so far,
+# plus why it stopped ('idle': no mutation at all, 'stale': mutated but never showed the number).
+BULK_JS = """
+const done = arguments[arguments.length - 1];
+const list = arguments[0];
+const fieldArgs = [arguments[1], arguments[2]];
+const extractFields = function () {""" + EXTRACT_JS + """};
+const resultsFor = function () {""" + RESULTS_FOR_JS + """};
+const settle = (before, c) => new Promise(resolve => {
+    const start = Date.now();
+    let last = before, lastChange = null;
+    const tick = setInterval(() => {
+        const cur = window.__mscDirty;
+        if (cur !== last) { last = cur; lastChange = Date.now(); }
+        const ready = lastChange !== null && Date.now() - lastChange >= 200 && resultsFor(c);
+        if (ready || Date.now() - start >= 6000) {
+            clearInterval(tick);
+            resolve(ready ? 'ready' : (lastChange === null ? 'idle' : 'stale'));
+        }
+    }, 50);
+});
+(async () => {
+    const out = [];
+    const input = document.querySelector('#trackingNumber');
+    for (const c of list) {
+        const pending = settle(window.__mscDirty, c);
+        input.focus();
+        input.value = c;
+        input.dispatchEvent(new Event('input', {bubbles: true}));
+        input.dispatchEvent(new Event('change', {bubbles: true}));
+        for (const type of ['keydown', 'keypress', 'keyup']) {
+            input.dispatchEvent(new KeyboardEvent(type, {key: 'Enter', code: 'Enter', keyCode: 13, which: 13, bubbles: true}));
+        }
+        const state = await pending;
+        if (state !== 'ready') return {rows: out, stopped: state};
+        out.push(extractFields.apply(null, fieldArgs));
+    }
+    return {rows: out, stopped: null};
+})().then(done, () => done(null));
+"""
+# ----------------------------------------
+
+FIELDS = ["ETA", "Port of Discharge", "Vessel/Voyage", "Equipment Handling Facility"]
+EXTRACT_ARGS = (HEADING_FIELDS, [(field, loc[1]) for field, loc in SELECTOR_FIELDS])
+
+logger = logging.getLogger(__name__)
+
+_driver_path = None
+_driver_path_lock = threading.Lock()
+
+
+def empty_result():
+    return dict.fromkeys(FIELDS)
+
+
+def tiny_pause(a=0.06, b=0.18):
+    time.sleep(random.uniform(a, b))
+
+
+def humanize_pause():
+    """Optional jitter between containers, only when MSC_HUMANIZE=1."""
+    if HUMANIZE:
+        time.sleep(random.uniform(0.15, 0.35))
+
+
+def get_driver_path():
+    """
+    Chromedriver path, resolved once. The path is kept in DRIVER_PATH_CACHE so
+    later runs skip the ChromeDriverManager lookup while the binary still exists.
+    """
+    global _driver_path
+    with _driver_path_lock:
+        if _driver_path and os.path.exists(_driver_path):
+            return _driver_path
+        try:
+            with open(DRIVER_PATH_CACHE) as fh:
+                cached = fh.read().strip()
+            if cached and os.path.exists(cached):
+                _driver_path = cached
+                return _driver_path
+        except OSError:
+            pass
+
+        _driver_path = ChromeDriverManager().install()
+        try:
+            os.makedirs(os.path.dirname(DRIVER_PATH_CACHE), exist_ok=True)
+            with open(DRIVER_PATH_CACHE, "w") as fh:
+                fh.write(_driver_path)
+        except OSError:
+            logger.warning("Could not cache chromedriver path in %s", DRIVER_PATH_CACHE)
+        return _driver_path
+
+
+def acquire_profile_slot():
+    """
+    Lock the first free worker slot under PROFILE_DIR and return (profile_dir, lock).
+    The lock is held until `release_profile_slot(lock)` (or process exit), so
+    concurrent runs and Streamlit sessions never share a Chrome profile.
+    """
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    slot = 0
+    while True:
+        lock = open(os.path.join(PROFILE_DIR, f"worker-{slot}.lock"), "a+")
+        try:
+            if fcntl:
+                fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            else:
+                lock.seek(0)
+                msvcrt.locking(lock.fileno(), msvcrt.LK_NBLCK, 1)
+            return os.path.join(PROFILE_DIR, f"worker-{slot}"), lock
+        except OSError:
+            lock.close()
+            slot += 1
+
+
+def release_profile_slot(lock):
+    # closing the handle drops the lock on both platforms
+    try:
+        lock.close()
+    except Exception:
+        pass
+
+
+def create_driver(headless=HEADLESS, profile_dir=PROFILE_DIR):
+    """Chrome (local, or on GRID_URL) with resource blocking and the results observer installed."""
+    opts = Options()
+    opts.add_argument("--no-sandbox")
+    opts.add_argument("--disable-dev-shm-usage")
+    opts.add_argument("--disable-gpu")
+    opts.add_argument("--disable-infobars")
+    opts.add_experimental_option("excludeSwitches", ["enable-automation"])
+    opts.add_experimental_option("useAutomationExtension", False)
+    opts.add_argument("--window-size=1400,900")
+    opts.add_argument(f"--user-agent={USER_AGENT}")
+    opts.add_argument("--blink-settings=imagesEnabled=false")
+    opts.add_argument("--disable-features=Translate,BackForwardCache")
+
+    if headless:
+        opts.add_argument("--headless=new")
+
+    if GRID_URL:
+        # the node owns the browser: profile, debugging port and chromedriver are its business
+        driver = webdriver.Remote(command_executor=GRID_URL, options=opts)
+    else:
+        # no --remote-debugging-port: chromedriver picks a free one per instance.
+        # Each instance still needs its own profile or Chrome hands over to the first one.
+        opts.add_argument(f"--user-data-dir={profile_dir}")
+        opts.add_argument("--profile-directory=Default")
+
+        service = Service(get_driver_path())
+        driver = webdriver.Chrome(service=service, options=opts)
+
+    # small navigator masks to avoid trivial detection
+    try:
+        driver.execute_cdp_cmd(
+            "Page.addScriptToEvaluateOnNewDocument",
+            {
+                "source": """
+                    Object.defineProperty(navigator, 'webdriver', {get: () => undefined});
+                    Object.defineProperty(navigator, 'plugins', {get: () => [1,2,3,4,5]});
+                    Object.defineProperty(navigator, 'languages', {get: () => ['en-US','en']});
+                """
+            },
+        )
+    except Exception:
+        pass
+
+    # drop images, fonts, media, stylesheets and trackers; the data cells only need the DOM
+    try:
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": BLOCKED_URLS})
+    except Exception:
+        logger.warning("Could not enable CDP resource blocking")
+
+    # install the results observer on every page load
+    try:
+        driver.execute_cdp_cmd("Page.addScriptToEvaluateOnNewDocument", {"source": RESULTS_OBSERVER_JS})
+    except Exception:
+        logger.warning("Could not install results observer via CDP; it is injected after page load instead")
+
+    wait = WebDriverWait(driver, MAX_WAIT)
+    return driver, wait
+
+
+def close_cookie_popup_if_present(driver, wait):
+    """
+    Accept cookie popup if present (OneTrust or similar).
+    Returns at once when consent is already stored (warm profile). Otherwise the
+    OneTrust SDK gets up to COOKIE_SDK_WAIT to load (it injects the banner late),
+    and the short per-selector waits are only used when a banner is really there.
+    """
+    try:
+        # OneTrust sets OptanonAlertBoxClosed once the banner has been answered
+        if any(c["name"] == "OptanonAlertBoxClosed" for c in driver.get_cookies()):
+            return
+        # the banner arrives after page load: wait for the SDK or its banner, not for a fixed time
+        try:
+            WebDriverWait(driver, COOKIE_SDK_WAIT, poll_frequency=0.1).until(
+                lambda d: d.find_elements(*COOKIE_BANNER) or d.execute_script(ONETRUST_ANSWERED_JS)
+            )
+        except TimeoutException:
+            pass
+        # zero-timeout probe: no banner, no waiting
+        if not any(driver.find_elements(by, sel) for by, sel in COOKIE_BUTTONS):
+            return
+
+        short = WebDriverWait(driver, COOKIE_WAIT)
+        for by, sel in COOKIE_BUTTONS:
+            try:
+                btn = short.until(EC.element_to_be_clickable((by, sel)))
+                driver.execute_script("arguments[0].scrollIntoView(true);", btn)
+                tiny_pause(0.08, 0.18)
+                try:
+                    btn.click()
+                except Exception:
+                    driver.execute_script("arguments[0].click();", btn)
+                logger.info("Closed cookie popup via %s %s", by, sel)
+                break
+            except Exception:
+                continue
+
+        # wait briefly for overlay to disappear (non-fatal)
+        try:
+            short.until_not(EC.presence_of_element_located(COOKIE_OVERLAY))
+        except Exception:
+            pass
+    except Exception:
+        pass
+
+
+def get_results_snapshot(driver):
+    """Return a short snapshot string of the results area used to detect changes quickly."""
+    try:
+        return driver.execute_script(SNAPSHOT_JS) or ""
+    except Exception:
+        return ""
+
+
+def extract_from_cells(driver):
+    """
+    Fallback for when EXTRACT_JS cannot run: find_elements for the results
+    cells (and the vessel/facility cells, matched by element id instead of
+    reading each cell's class), one .text read per cell, and the
+    heading -> value structure is parsed in Python.
+    """
+    data = empty_result()
+    try:
+        cells = driver.find_elements(*RESULTS_CELL)
+        vessel_ids = {el.id for el in driver.find_elements(*VESSEL_CELL)}
+        facility_ids = {el.id for el in driver.find_elements(*FACILITY_CELL)}
+    except Exception:
+        return data
+
+    for cell in cells:
+        try:
+            lines = [ln.strip() for ln in (cell.text or "").splitlines() if ln.strip()]
+        except Exception:
+            continue
+        if not lines:
+            continue
+        heading = lines[0]
+        values = [v for v in lines[1:] if v.upper() != "N.A"]
+        if not values:
+            continue
+        if "POD ETA" in heading:
+            data["ETA"] = data["ETA"] or values[0]
+        elif "Port of Discharge" in heading:
+            data["Port of Discharge"] = data["Port of Discharge"] or values[0]
+        elif cell.id in vessel_ids or "Vessel" in heading or "Voyage" in heading:
+            data["Vessel/Voyage"] = data["Vessel/Voyage"] or values[0]
+        elif cell.id in facility_ids:
+            data["Equipment Handling Facility"] = data["Equipment Handling Facility"] or values[0]
+    return data
+
+
+def extract_tracking_data(driver):
+    """
+    Return dict with ETA, Port of Discharge, Vessel/Voyage, Equipment Handling Facility.
+    """
+    data = empty_result()
+    try:
+        data.update(driver.execute_script(EXTRACT_JS, *EXTRACT_ARGS) or {})
+    except Exception:
+        return extract_from_cells(driver)
+    return data
+
+
+def results_show(driver, container_number):
+    """True once the results area names `container_number`."""
+    try:
+        return bool(driver.execute_script(RESULTS_FOR_JS, container_number))
+    except Exception:
+        return False
+
+
+def extract_when_ready(driver, container_number, timeout=3):
+    """
+    Extract, and if every field came back empty (page not ready yet) wait once
+    for the vessel cell and extract again. Results that belong to another
+    container (the previous search still on screen) are discarded.
+    """
+    try:
+        WebDriverWait(driver, timeout, poll_frequency=0.1).until(
+            lambda d: results_show(d, container_number)
+        )
+    except TimeoutException:
+        logger.warning("Results on the page are not for %s, discarding them", container_number)
+        return empty_result()
+    data = extract_tracking_data(driver)
+    if any(data.values()):
+        return data
+    try:
+        WebDriverWait(driver, timeout).until(
+            EC.presence_of_element_located(VESSEL_VALUE)
+        )
+    except TimeoutException:
+        return data
+    return extract_tracking_data(driver)
+
+
+def submit_container_quick(driver, input_el, container_number):
+    """
+    Set the input value via JS and trigger input events, then press Enter.
+    This is faster than clicking + typing each time.
+    """
+    # set value and dispatch input event (some frameworks rely on it)
+    script = """
+    const el = arguments[0];
+    const val = arguments[1];
+    el.focus();
+    el.value = val;
+    el.dispatchEvent(new Event('input', { bubbles: true }));
+    el.dispatchEvent(new Event('change', { bubbles: true }));
+    """
+    driver.execute_script(script, input_el, container_number)
+    input_el.send_keys(Keys.RETURN)
+
+
+def get_change_marker(driver):
+    """
+    Mutation count from the injected observer (one round-trip), or the text
+    snapshot when the observer is not available.
+    """
+    try:
+        dirty = driver.execute_script("return window.__mscDirty;")
+    except Exception:
+        dirty = None
+    return dirty if dirty is not None else get_results_snapshot(driver)
+
+
+def wait_for_change(driver, prev_marker, container_number=None, timeout=6, quiet=0.2):
+    """
+    Wait until the results area has changed and then stayed quiet for `quiet`
+    seconds (the page renders in several mutations), and, when given, shows
+    `container_number`. Returns True if that happened before the timeout.
+    """
+    state = {"marker": prev_marker, "since": None}
+
+    def settled(d):
+        cur = get_change_marker(d)
+        if cur == "":
+            return False
+        if cur != state["marker"]:
+            state["marker"], state["since"] = cur, time.monotonic()
+            return False
+        if state["since"] is None or time.monotonic() - state["since"] < quiet:
+            return False
+        return container_number is None or results_show(d, container_number)
+
+    try:
+        WebDriverWait(driver, timeout, poll_frequency=0.1).until(settled)
+        return True
+    except TimeoutException:
+        return False
+
+
+def bulk_track_js(driver, containers):
+    """
+    Track a batch of containers with one execute_async_script call.
+    Returns (rows, stopped): one data dict per container tracked, in order, and
+    why the batch stopped short ('idle' / 'stale', None if it did not). The
+    caller tracks the containers after the last row itself.
+    Returns None when the script itself failed.
+    """
+    driver.set_script_timeout(len(containers) * 10)
+    result = driver.execute_async_script(BULK_JS, containers, *EXTRACT_ARGS)
+    if result is None:
+        return None
+    return [{**empty_result(), **(row or {})} for row in result["rows"]], result["stopped"]
+
+
+def take_batch(todo, size, stop=None):
+    """Pull up to `size` items off the queue without blocking (none once `stop` is set)."""
+    batch = []
+    if stop is not None and stop.is_set():
+        return batch
+    while len(batch) < size:
+        try:
+            batch.append(todo.get_nowait())
+        except queue.Empty:
+            break
+    return batch
+
+
+def open_tracking_page(driver, wait):
+    """Open the tracking page, accept cookies and return the (reusable) input field."""
+    # open page once
+    driver.get(TRACKING_PAGE)
+    tiny_pause(0.2, 0.6)
+
+    # remote (grid) sessions have no CDP, so the observer may not be there yet
+    driver.execute_script("if (window.__mscDirty === undefined) {" + RESULTS_OBSERVER_JS + "}")
+
+    # accept cookies once
+    close_cookie_popup_if_present(driver, wait)
+
+    # locate the input once (reuse)
+    input_field = wait.until(EC.presence_of_element_located(INPUT_LOCATOR))
+    # ensure visible
+    driver.execute_script("arguments[0].scrollIntoView({block:'center'});", input_field)
+    tiny_pause(0.06, 0.12)
+    return input_field
+
+
+def get_input(driver, wait):
+    """
+    Re-resolve the tracking input after its handle went stale (the page navigated,
+    e.g. Enter submitted a real form). Waits for the new document instead of
+    doing a fresh get(), and only reopens the page if the input is really gone.
+    """
+    wait.until(lambda d: d.execute_script("return document.readyState") == "complete")
+    driver.execute_script("if (window.__mscDirty === undefined) {" + RESULTS_OBSERVER_JS + "}")
+    found = driver.find_elements(*INPUT_LOCATOR)
+    if found:
+        return found[0]
+    logger.info("Tracking input gone after navigation, reopening the page")
+    return open_tracking_page(driver, wait)
+
+
+def browser_worker(worker_id, todo, done, stop):
+    """
+    Own one Chrome instance and keep its tab on the tracking page.
+    Pulls (key, container) off `todo` until it is empty (or `stop` is set) and
+    pushes (key, data) onto `done`.
+    """
+    driver = None
+    profile_lock = None
+    try:
+        if GRID_URL:
+            driver, wait = create_driver(headless=HEADLESS)
+        else:
+            profile_dir, profile_lock = acquire_profile_slot()
+            driver, wait = create_driver(headless=HEADLESS, profile_dir=profile_dir)
+        input_field = open_tracking_page(driver, wait)
+        prev_marker = get_change_marker(driver)
+
+        batch_mode = IN_PAGE_BATCH > 0
+        while True:
+            batch = take_batch(todo, IN_PAGE_BATCH if batch_mode else 1, stop)
+            if not batch:
+                break
+
+            if batch_mode:
+                logger.info("[worker %d] Tracking %d containers in-page", worker_id, len(batch))
+                try:
+                    batch_data = bulk_track_js(driver, [c for _, c in batch])
+                except WebDriverException:
+                    # the page navigated mid-batch; redo this batch one by one on the recovered page
+                    logger.warning("[worker %d] In-page batch interrupted, retrying per-container", worker_id)
+                    batch_data = None
+                    input_field = get_input(driver, wait)
+                prev_marker = get_change_marker(driver)
+                if batch_data is not None:
+                    rows, stopped = batch_data
+                    for (key, _), data in zip(batch, rows):
+                        done.put((key, data))
+                    if not rows and stopped == "idle":
+                        # the very first Enter did not trigger a search; drive this worker from Python
+                        logger.warning("[worker %d] In-page search did not react, switching to per-container", worker_id)
+                        batch_mode = False
+                    # containers whose results never showed up get the per-container waits below
+                    batch = batch[len(rows):]
+
+            for key, container in batch:
+                logger.info("[worker %d] Tracking %s", worker_id, container)
+
+                # quick submit (JS + Enter); a stale handle means the page navigated
+                try:
+                    submit_container_quick(driver, input_field, container)
+                except StaleElementReferenceException:
+                    input_field = get_input(driver, wait)
+                    prev_marker = get_change_marker(driver)
+                    submit_container_quick(driver, input_field, container)
+
+                # the observer-driven wait is the only synchronization point
+                wait_for_change(driver, prev_marker, container, timeout=6)
+
+                # extract (retries once if the page was not ready)
+                done.put((key, extract_when_ready(driver, container)))
+
+                # update change marker (cheap)
+                prev_marker = get_change_marker(driver)
+
+                humanize_pause()
+
+    except Exception:
+        logger.exception("Browser worker %d stopped", worker_id)
+    finally:
+        if driver is not None:
+            try:
+                driver.quit()
+            except Exception:
+                pass
+            logger.info("Chrome driver %d closed", worker_id)
+        if profile_lock is not None:
+            release_profile_slot(profile_lock)
+
+
+def track_in_browser(items, on_result=None):
+    """
+    Fan (key, container) pairs out over a pool of Chrome workers. Returns {key: data}.
+    `on_result(key, data)` is called on the calling thread as each container
+    finishes, so callers may touch Streamlit or files from it.
+    """
+    todo = queue.Queue()
+    for key, container in items:
+        todo.put((key, container))
+    done = queue.Queue()
+    stop = threading.Event()  # set when the caller gives up, so no Chrome keeps working unread
+
+    n_workers = min(GRID_WORKERS if GRID_URL else BROWSER_WORKERS, len(items))
+    logger.info("Tracking %d containers with %d browser workers.", len(items), n_workers)
+    workers = [
+        threading.Thread(target=browser_worker, args=(i, todo, done, stop), daemon=True)
+        for i in range(n_workers)
+    ]
+    for w in workers:
+        w.start()
+
+    found = {}
+
+    def collect(key, data):
+        found[key] = data
+        if on_result:
+            on_result(key, data)
+
+    try:
+        while len(found) < len(items) and any(w.is_alive() for w in workers):
+            try:
+                collect(*done.get(timeout=0.5))
+            except queue.Empty:
+                continue
+    finally:
+        # normally a no-op (the queue is drained); if on_result raised, the workers quit
+        stop.set()
+    for w in workers:
+        w.join()
+    while not done.empty():
+        collect(*done.get())
+
+    # containers lost with a crashed worker come back empty
+    for key, container in items:
+        if key not in found:
+            logger.warning("No result for %s", container)
+            collect(key, empty_result())
+    return found
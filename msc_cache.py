@@ -0,0 +1,83 @@
+# msc_cache.py
+# ===========================================
+# Persistent result cache keyed by container number (sqlite)
+# ===========================================
+
+import sqlite3
+import time
+from datetime import datetime, timedelta
+
+# ---------------- CONFIG ----------------
+CACHE_FILE = "msc_cache.db"
+TTL_IN_TRANSIT = 6 * 3600       # still moving: re-track a few times a day
+TTL_DELIVERED = 7 * 24 * 3600   # delivered: hardly changes any more
+DELIVERED_AFTER_DAYS = 3        # without events, only this long past the ETA counts as delivered
+# newest API event descriptions that mean the container has left the terminal for good
+DELIVERED_EVENTS = ("import to consignee", "empty received at cy", "empty returned", "delivered")
+ETA_FORMATS = ("%d/%m/%Y", "%d/%m/%Y %H:%M", "%Y-%m-%d", "%Y-%m-%dT%H:%M:%S")
+# ----------------------------------------
+
+FIELDS = ["ETA", "Port of Discharge", "Vessel/Voyage", "Equipment Handling Facility"]
+
+
+def connect(path=CACHE_FILE):
+    conn = sqlite3.connect(path)
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS t("
+        "cn TEXT PRIMARY KEY, eta TEXT, pod TEXT, vessel TEXT, facility TEXT, ts REAL, status TEXT)"
+    )
+    return conn
+
+
+def status_of(data):
+    """
+    'Delivered' when the newest API event says so. Without events (browser results)
+    the ETA has to be DELIVERED_AFTER_DAYS in the past; anything else, including
+    an unreadable ETA, is 'In Transit'.
+    """
+    event = (data.get("Latest Event") or "").strip().lower()
+    if event:
+        return "Delivered" if any(e in event for e in DELIVERED_EVENTS) else "In Transit"
+    eta = (data.get("ETA") or "").strip()
+    cutoff = datetime.now() - timedelta(days=DELIVERED_AFTER_DAYS)
+    for fmt in ETA_FORMATS:
+        try:
+            return "Delivered" if datetime.strptime(eta, fmt) < cutoff else "In Transit"
+        except ValueError:
+            continue
+    return "In Transit"
+
+
+def ttl_for(status):
+    return TTL_DELIVERED if status == "Delivered" else TTL_IN_TRANSIT
+
+
+def get(conn, container):
+    """Cached data for `container` if it is still fresh, else None."""
+    row = conn.execute(
+        "SELECT eta, pod, vessel, facility, ts, status FROM t WHERE cn=?", (container,)
+    ).fetchone()
+    if row is None or time.time() - row[4] > ttl_for(row[5]):
+        return None
+    return dict(zip(FIELDS, row[:4]))
+
+
+def get_many(conn, containers):
+    """{container: data} for every container with a fresh cache entry."""
+    hits = {}
+    for container in containers:
+        data = get(conn, container)
+        if data is not None:
+            hits[container] = data
+    return hits
+
+
+def put(conn, container, data):
+    """Store a fresh result. All-empty results are not cached so they get retried next run."""
+    if not any(data.get(f) for f in FIELDS):
+        return
+    conn.execute(
+        "INSERT OR REPLACE INTO t(cn, eta, pod, vessel, facility, ts, status) VALUES (?, ?, ?, ?, ?, ?, ?)",
+        (container, *(data.get(f) for f in FIELDS), time.time(), status_of(data)),
+    )
+    conn.commit()
@@ -0,0 +1,56 @@
+# msc_checkpoint.py
+# ===========================================
+# Per-run CSV checkpoints, so an interrupted run can resume where it stopped
+# ===========================================
+
+import hashlib
+import os
+import time
+
+import pandas as pd
+
+# ---------------- CONFIG ----------------
+CHECKPOINT_DIR = "checkpoints"
+MAX_AGE = 6 * 3600   # rows older than this are tracked again (same as msc_cache.TTL_IN_TRANSIT)
+TIMESTAMP_FIELD = "Tracked At"
+# ----------------------------------------
+
+
+def path_for(script, containers):
+    """
+    Checkpoint file for `script` tracking exactly `containers`, so different
+    scripts and different inputs never share (or delete) each other's file.
+    """
+    digest = hashlib.sha1("\n".join(containers).encode("utf-8")).hexdigest()[:12]
+    return os.path.join(CHECKPOINT_DIR, f"tracked-{script}-{digest}.csv")
+
+
+def load(path, max_age=MAX_AGE, dtype=None):
+    """Rows written less than `max_age` seconds ago, without the timestamp column (empty frame if none)."""
+    try:
+        rows = pd.read_csv(path, dtype=dtype or {"Container Number": str})
+    except (FileNotFoundError, pd.errors.EmptyDataError):
+        return pd.DataFrame()
+    if TIMESTAMP_FIELD not in rows.columns:
+        return pd.DataFrame()
+    ts = pd.to_numeric(rows.pop(TIMESTAMP_FIELD), errors="coerce")
+    return rows[ts > time.time() - max_age].reset_index(drop=True)
+
+
+def open_writer(path, resume):
+    """Open `path` for appending (or truncate it when there is nothing to resume)."""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    return open(path, "a" if resume else "w", newline="", encoding="utf-8")
+
+
+def stamp(row):
+    """`row` with the write time added, for csv.DictWriter."""
+    return {**row, TIMESTAMP_FIELD: time.time()}
+
+
+def remove(path):
+    # another session tracking the same list may have finished first
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
@@ -0,0 +1,17 @@
+import json
+import os
+import sys
+
+import pytest
+
+# the scripts live at the repo root, not in a package
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+
+@pytest.fixture
+def tracking_info():
+    with open(os.path.join(FIXTURES, "tracking_info.json"), encoding="utf-8") as fh:
+        return json.load(fh)
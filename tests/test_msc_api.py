@@ -0,0 +1,75 @@
+import pytest
+
+import msc_api
+
+
+class FakeResponse:
+    def __init__(self, payload):
+        self.payload = payload
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return self.payload
+
+
+class FakeSession:
+    def __init__(self, payload):
+        self.payload = payload
+
+    def post(self, url, json=None, timeout=None):
+        return FakeResponse(self.payload)
+
+
+def test_parse_picks_the_requested_container(tracking_info):
+    data = msc_api.parse_tracking_info(tracking_info, "MSDU5837828")
+    assert data == {
+        "ETA": "21/03/2026",  # no PodEtaDate of its own: falls back to the bill's final ETA
+        "Port of Discharge": "FELIXSTOWE, GB",
+        "Vessel/Voyage": "MSC AMELIA / FE609W",
+        "Equipment Handling Facility": None,  # latest event says N.A
+        "Latest Event": "Full Transshipment Loaded",
+    }
+
+
+def test_parse_other_container_in_same_bill(tracking_info):
+    data = msc_api.parse_tracking_info(tracking_info, "CAAU8042212")
+    assert data["ETA"] == "19/03/2026"
+    assert data["Vessel/Voyage"] == "MSC OTHER / OT605W"
+    assert data["Equipment Handling Facility"] == "NINGBO BEILUN TERMINAL"
+
+
+def test_parse_matches_case_insensitively(tracking_info):
+    data = msc_api.parse_tracking_info(tracking_info, " msdu5837828 ")
+    assert data["Vessel/Voyage"] == "MSC AMELIA / FE609W"
+
+
+def test_parse_ignores_other_containers(tracking_info):
+    # the payload only holds CAAU8042212 and MSDU5837828: their data must not be returned
+    assert not any(msc_api.parse_tracking_info(tracking_info, "TGHU0000000").values())
+
+
+def test_fetch_raises_when_container_not_in_payload(tracking_info):
+    with pytest.raises(ValueError):
+        msc_api.fetch(FakeSession(tracking_info), "TGHU0000000")
+
+
+def test_parse_empty_payload():
+    assert not any(msc_api.parse_tracking_info({"IsSuccess": True, "Data": {}}, "X").values())
+
+
+def test_fetch_returns_parsed_data(tracking_info):
+    data = msc_api.fetch(FakeSession(tracking_info), "MSDU5837828")
+    assert data["Port of Discharge"] == "FELIXSTOWE, GB"
+
+
+def test_fetch_raises_when_success_carries_no_fields():
+    with pytest.raises(ValueError):
+        msc_api.fetch(FakeSession({"IsSuccess": True, "Data": {"BillOfLadings": []}}), "MSDU5837828")
+
+
+def test_fetch_raises_when_not_success(tracking_info):
+    tracking_info["IsSuccess"] = False
+    with pytest.raises(ValueError):
+        msc_api.fetch(FakeSession(tracking_info), "MSDU5837828")
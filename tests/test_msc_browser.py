@@ -0,0 +1,38 @@
+import msc_browser
+
+
+class FakeElement:
+    def __init__(self, id_, text):
+        self.id = id_
+        self.text = text
+
+
+class FakeDriver:
+    def __init__(self, by_locator):
+        self.by_locator = by_locator
+
+    def find_elements(self, by, sel):
+        return self.by_locator.get((by, sel), [])
+
+
+def test_extract_from_cells_parses_heading_and_value():
+    eta = FakeElement("1", "POD ETA\n21/03/2026")
+    pod = FakeElement("2", "Port of Discharge\nN.A\nFELIXSTOWE, GB")
+    vessel = FakeElement("3", "Departure\nMSC AMELIA / FE609W")
+    facility = FakeElement("4", "Location\nFELIXSTOWE TERMINAL")
+    empty = FakeElement("5", "Final\nN.A")
+    driver = FakeDriver({
+        msc_browser.RESULTS_CELL: [eta, pod, vessel, facility, empty],
+        msc_browser.VESSEL_CELL: [FakeElement("3", "")],
+        msc_browser.FACILITY_CELL: [FakeElement("4", "")],
+    })
+    assert msc_browser.extract_from_cells(driver) == {
+        "ETA": "21/03/2026",
+        "Port of Discharge": "FELIXSTOWE, GB",
+        "Vessel/Voyage": "MSC AMELIA / FE609W",
+        "Equipment Handling Facility": "FELIXSTOWE TERMINAL",
+    }
+
+
+def test_extract_from_cells_without_results():
+    assert msc_browser.extract_from_cells(FakeDriver({})) == msc_browser.empty_result()
@@ -0,0 +1,53 @@
+import time
+from datetime import datetime, timedelta
+
+import msc_cache
+
+
+def eta(days):
+    return (datetime.now() + timedelta(days=days)).strftime("%d/%m/%Y")
+
+
+def result(**extra):
+    return {"ETA": eta(-1), "Port of Discharge": "FELIXSTOWE, GB", "Vessel/Voyage": "MSC AMELIA", **extra}
+
+
+def test_latest_event_decides_status():
+    assert msc_cache.status_of(result(**{"Latest Event": "Import to consignee"})) == "Delivered"
+    # ETA long gone, but the container is still sitting at transshipment
+    data = result(**{"ETA": eta(-30), "Latest Event": "Full Transshipment Discharged"})
+    assert msc_cache.status_of(data) == "In Transit"
+
+
+def test_eta_must_be_well_past_without_events():
+    assert msc_cache.status_of(result()) == "In Transit"
+    assert msc_cache.status_of(result(ETA=eta(-msc_cache.DELIVERED_AFTER_DAYS - 1))) == "Delivered"
+    assert msc_cache.status_of(result(ETA=eta(5))) == "In Transit"
+    assert msc_cache.status_of(result(ETA="N.A")) == "In Transit"
+
+
+def test_get_respects_ttl(monkeypatch):
+    conn = msc_cache.connect(":memory:")
+    msc_cache.put(conn, "MSDU5837828", result())
+    assert msc_cache.get(conn, "MSDU5837828")["Vessel/Voyage"] == "MSC AMELIA"
+
+    now = time.time()
+    monkeypatch.setattr(msc_cache.time, "time", lambda: now + msc_cache.TTL_IN_TRANSIT + 1)
+    assert msc_cache.get(conn, "MSDU5837828") is None
+
+
+def test_delivered_entries_live_longer(monkeypatch):
+    conn = msc_cache.connect(":memory:")
+    msc_cache.put(conn, "MSDU5837828", result(**{"Latest Event": "Empty received at CY"}))
+
+    now = time.time()
+    monkeypatch.setattr(msc_cache.time, "time", lambda: now + msc_cache.TTL_IN_TRANSIT + 1)
+    assert msc_cache.get(conn, "MSDU5837828") is not None
+    monkeypatch.setattr(msc_cache.time, "time", lambda: now + msc_cache.TTL_DELIVERED + 1)
+    assert msc_cache.get(conn, "MSDU5837828") is None
+
+
+def test_empty_results_are_not_cached():
+    conn = msc_cache.connect(":memory:")
+    msc_cache.put(conn, "MSDU5837828", dict.fromkeys(msc_cache.FIELDS))
+    assert msc_cache.get(conn, "MSDU5837828") is None
@@ -0,0 +1,38 @@
+import csv
+import os
+
+import msc_checkpoint
+
+
+def write(path, rows, fields):
+    with msc_checkpoint.open_writer(path, resume=False) as fh:
+        writer = csv.DictWriter(fh, fieldnames=fields + [msc_checkpoint.TIMESTAMP_FIELD])
+        writer.writeheader()
+        for row in rows:
+            writer.writerow(row)
+
+
+def test_paths_differ_per_script_and_input():
+    a = msc_checkpoint.path_for("main", ["MSDU5837828", "CAAU8042212"])
+    assert a == msc_checkpoint.path_for("main", ["MSDU5837828", "CAAU8042212"])
+    assert a != msc_checkpoint.path_for("app", ["MSDU5837828", "CAAU8042212"])
+    assert a != msc_checkpoint.path_for("main", ["MSDU5837828"])
+
+
+def test_load_drops_expired_rows_and_timestamp(tmp_path):
+    path = str(tmp_path / "ckpt.csv")
+    fresh = msc_checkpoint.stamp({"Container Number": "MSDU5837828", "ETA": "21/03/2026"})
+    stale = {"Container Number": "CAAU8042212", "ETA": "19/03/2026",
+             msc_checkpoint.TIMESTAMP_FIELD: fresh[msc_checkpoint.TIMESTAMP_FIELD] - msc_checkpoint.MAX_AGE - 1}
+    write(path, [fresh, stale], ["Container Number", "ETA"])
+
+    rows = msc_checkpoint.load(path)
+    assert list(rows.columns) == ["Container Number", "ETA"]
+    assert list(rows["Container Number"]) == ["MSDU5837828"]
+
+
+def test_missing_checkpoint(tmp_path):
+    path = str(tmp_path / "missing.csv")
+    assert msc_checkpoint.load(path).empty
+    msc_checkpoint.remove(path)  # already gone: no error
+    assert not os.path.exists(path)